@@ -31,19 +31,16 @@ use_pinecone = st.sidebar.toggle("Use Pinecone Vector DB", False)
 st.session_state.use_pinecone = use_pinecone
 
 if use_pinecone:
-    if "pinecone_api_key" not in st.secrets or "pinecone_env" not in st.secrets or "pinecone_index" not in st.secrets:
+    if "pinecone_api_key" not in st.secrets or "pinecone_index" not in st.secrets:
         st.sidebar.warning("Pinecone settings not found in secrets")
         pinecone_api_key = st.sidebar.text_input("Pinecone API Key", type="password")
-        pinecone_env = st.sidebar.text_input("Pinecone Environment")
         pinecone_index = st.sidebar.text_input("Pinecone Index Name")
         
-        if pinecone_api_key and pinecone_env and pinecone_index:
+        if pinecone_api_key and pinecone_index:
             st.session_state.pinecone_api_key = pinecone_api_key
-            st.session_state.pinecone_env = pinecone_env
             st.session_state.pinecone_index = pinecone_index
     else:
         st.session_state.pinecone_api_key = st.secrets.pinecone_api_key
-        st.session_state.pinecone_env = st.secrets.pinecone_env
         st.session_state.pinecone_index = st.secrets.pinecone_index
 
 # Initialize vector store if needed
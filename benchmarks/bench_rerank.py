@@ -0,0 +1,192 @@
+"""Measure the latency overhead of maximal marginal relevance reranking.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rerank
+
+FAISS: times FAISSRetriever.invoke end to end against the plain as_retriever(k) it replaced, on a
+real FAISS index of synthetic mistral-embed sized vectors, then breaks the difference down into
+the larger search, reconstructing vectors with docstore lookups, and the rerank itself.
+
+Pinecone: the network is out of reach here, so the fetch cost is reported as the size of a query
+response and the time to parse it, for top_k=k without values against top_k=fetch_k with values.
+The rerank cost is timed separately on the parsed matches.
+"""
+import argparse
+import json
+import time
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from config.config import RERANK_FETCH_K, RERANK_LAMBDA_MULT, RERANK_MAX_PER_SOURCE
+from utils.faiss_store import FAISSRetriever
+from utils.rerank import maximal_marginal_relevance
+
+EMBEDDING_DIM = 1024
+
+# Overlapping chunks of one page end up with near-duplicate vectors
+CHUNKS_PER_PAGE = 4
+
+class QueryEmbeddings(Embeddings):
+    """Embeddings returning precomputed query vectors, so timings exclude the embedding API"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+def make_corpus(rng, chunks, dim):
+    """Build chunk vectors in groups of near-duplicates, with their texts and metadata"""
+    pages = -(-chunks // CHUNKS_PER_PAGE)
+    centers = rng.standard_normal((pages, dim)).astype(np.float32)
+    vectors = np.repeat(centers, CHUNKS_PER_PAGE, axis=0)[:chunks]
+    vectors += 0.05 * rng.standard_normal(vectors.shape).astype(np.float32)
+    texts = [f"chunk {i} " + "lorem ipsum " * 80 for i in range(chunks)]
+    metadatas = [
+        {"source": f"doc_{i // (CHUNKS_PER_PAGE * 10)}.pdf", "original_name": f"Document {i // (CHUNKS_PER_PAGE * 10)}", "chunk_index": i}
+        for i in range(chunks)
+    ]
+    return vectors, texts, metadatas
+
+def make_queries(rng, vectors, count):
+    """Queries close to random pages of the corpus"""
+    picks = rng.integers(0, len(vectors), count)
+    queries = vectors[picks] + 0.3 * rng.standard_normal((count, vectors.shape[1])).astype(np.float32)
+    return {f"query {i}": query.tolist() for i, query in enumerate(queries)}
+
+def time_calls(func, args):
+    samples = []
+    for arg in args:
+        start = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+def report(name, samples):
+    print(f"  {name:<34} p50 {percentile_ms(samples, 50):8.3f} ms  p95 {percentile_ms(samples, 95):8.3f} ms")
+
+def bench_faiss(vectors, texts, metadatas, queries, args):
+    embeddings = QueryEmbeddings(queries)
+    vector_store = FAISS.from_embeddings(list(zip(texts, vectors.tolist())), embeddings, metadatas=metadatas)
+    names = list(queries)
+
+    baseline = vector_store.as_retriever(search_kwargs={"k": args.k})
+    reranking = FAISSRetriever(
+        vector_store=vector_store,
+        embeddings=embeddings,
+        k=args.k,
+        fetch_k=args.fetch_k,
+        lambda_mult=args.lambda_mult,
+        max_per_source=args.max_per_source
+    )
+
+    # Warm up both paths before timing
+    baseline.invoke(names[0])
+    reranking.invoke(names[0])
+
+    query_arrays = {name: np.array([queries[name]], dtype=np.float32) for name in names}
+
+    def reconstruct(name):
+        _, indices = vector_store.index.search(query_arrays[name], args.fetch_k)
+        for i in indices[0]:
+            vector_store.docstore.search(vector_store.index_to_docstore_id[int(i)])
+            vector_store.index.reconstruct(int(i))
+
+    candidates = {}
+    for name in names:
+        _, indices = vector_store.index.search(query_arrays[name], args.fetch_k)
+        candidates[name] = (
+            [vector_store.index.reconstruct(int(i)) for i in indices[0]],
+            [metadatas[int(i)]["source"] for i in indices[0]]
+        )
+
+    def rerank(name):
+        candidate_vectors, sources = candidates[name]
+        maximal_marginal_relevance(
+            queries[name],
+            candidate_vectors,
+            k=args.k,
+            lambda_mult=args.lambda_mult,
+            sources=sources,
+            max_per_source=args.max_per_source
+        )
+
+    baseline_samples = time_calls(baseline.invoke, names)
+    reranking_samples = time_calls(reranking.invoke, names)
+    print(f"faiss: {len(texts)} chunks, end to end")
+    report(f"as_retriever(k={args.k})", baseline_samples)
+    report(f"FAISSRetriever(fetch_k={args.fetch_k})", reranking_samples)
+    overhead = percentile_ms(reranking_samples, 50) - percentile_ms(baseline_samples, 50)
+    print(f"  overhead at p50: {overhead:.3f} ms")
+    print("faiss: breakdown")
+    report(f"index search k={args.k}", time_calls(lambda name: vector_store.index.search(query_arrays[name], args.k), names))
+    report(f"index search k={args.fetch_k}", time_calls(lambda name: vector_store.index.search(query_arrays[name], args.fetch_k), names))
+    report("search + reconstruct + docstore", time_calls(reconstruct, names))
+    report("rerank", time_calls(rerank, names))
+
+def bench_pinecone(vectors, texts, metadatas, queries, args):
+    names = list(queries)
+    rng = np.random.default_rng(1)
+
+    def response(top_k, include_values):
+        picks = rng.choice(len(texts), top_k, replace=False)
+        matches = []
+        for i in picks:
+            match = {"id": f"{i:016x}#{i}", "score": 0.8, "metadata": {**metadatas[i], "text": texts[i]}}
+            if include_values:
+                # Serialized at float32 precision, as the REST API returns them
+                match["values"] = np.round(vectors[i].astype(np.float64), 7).tolist()
+            matches.append(match)
+        return json.dumps({"matches": matches, "namespace": "file"})
+
+    plain = [response(args.k, False) for _ in names]
+    with_values = [response(args.fetch_k, True) for _ in names]
+
+    print("pinecone: fetch, per namespace queried")
+    print(f"  {'top_k=' + str(args.k) + ' metadata':<34} {len(plain[0]) / 1024:8.1f} KB response")
+    print(f"  {'top_k=' + str(args.fetch_k) + ' metadata + values':<34} {len(with_values[0]) / 1024:8.1f} KB response")
+    report(f"parse top_k={args.k}", time_calls(json.loads, plain))
+    report(f"parse top_k={args.fetch_k} with values", time_calls(json.loads, with_values))
+
+    parsed = {name: json.loads(payload)["matches"] for name, payload in zip(names, with_values)}
+
+    def rerank(name):
+        matches = parsed[name]
+        maximal_marginal_relevance(
+            queries[name],
+            [match["values"] for match in matches],
+            k=args.k,
+            lambda_mult=args.lambda_mult,
+            sources=[match["metadata"]["source"] for match in matches],
+            max_per_source=args.max_per_source
+        )
+
+    print("pinecone: rerank")
+    report("rerank", time_calls(rerank, names))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--fetch-k", type=int, default=RERANK_FETCH_K)
+    parser.add_argument("--lambda-mult", type=float, default=RERANK_LAMBDA_MULT)
+    parser.add_argument("--max-per-source", type=int, default=RERANK_MAX_PER_SOURCE)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors, texts, metadatas = make_corpus(rng, args.chunks, EMBEDDING_DIM)
+    queries = make_queries(rng, vectors, args.queries)
+    print(f"k={args.k} fetch_k={args.fetch_k} lambda_mult={args.lambda_mult} max_per_source={args.max_per_source} queries={args.queries}")
+    bench_faiss(vectors, texts, metadatas, queries, args)
+    bench_pinecone(vectors, texts, metadatas, queries, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""Simulate concurrent users of the Streamlit app and report capacity numbers.
+
+Run from the repository root, with the bench dependencies installed:
+
+    poetry install --with bench
+    python -m benchmarks.load_test --sessions 20 --rounds 5
+
+Every session runs in its own process, driving the app headlessly through its own AppTest.
+AppTest keeps global runtime state and is not thread safe, so sessions cannot share a process.
+They start together once every process has imported and opened the app. Each round asks a
+question on the Q&A page, then lists, searches, pages through and bulk toggles documents in the
+Document Manager. Bulk toggles are limited to a search matching the documents seeded for that
+session, so sessions never disable the documents others are asking about. The first round of
+the first session also imports a Confluence space. Mistral and Confluence are replaced by
+in-process stubs with configurable latency. The app runs in a scratch working directory seeded
+with synthetic documents, so the real ./data is never touched.
+
+Memory is reported per session process. In a real server, sessions share one interpreter, the app
+modules and st.cache_resource entries, so the cost of a session is its growth after the imports.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+import psutil
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = REPO_ROOT / "app.py"
+
+EMBEDDING_DIM = 1024
+
+QUESTIONS = [
+    "How do I reset the controller?",
+    "What is the maintenance interval for the pump?",
+    "Who owns the deployment checklist?",
+    "Where are the test bench calibration values documented?",
+    "What changed in the last release?"
+]
+
+WORDS = (
+    "engine pump controller valve sensor calibration maintenance procedure checklist release "
+    "deployment interval pressure temperature bench inspection torque manual schedule owner"
+).split()
+
+class StubEmbeddings(Embeddings):
+    """Deterministic stand-in for Mistral embeddings with a fixed latency per request"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def _embed(self, text):
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(np.float32).tolist()
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return self._embed(text)
+
+def make_stub_llm(latency):
+    """Stand-in for the Mistral chat model answering after a fixed latency"""
+    return FakeListChatModel(responses=["This is a stubbed answer."], sleep=latency)
+
+def make_stub_confluence(pages, latency):
+    """Stand-in for the requests module used to fetch a Confluence space"""
+    results = [
+        {
+            "id": str(page_id),
+            "parentId": str(page_id // 4) if page_id else "root",
+            "title": f"Confluence page {page_id}",
+            "body": {"storage": {"value": f"<div id='main-content'><p>{random_text(page_id, 200)}</p></div>"}}
+        }
+        for page_id in range(pages)
+    ]
+    text = json.dumps({"results": results})
+
+    def get(url, headers=None, auth=None):
+        time.sleep(latency)
+        return SimpleNamespace(status_code=200, text=text)
+
+    return SimpleNamespace(get=get)
+
+def random_text(seed, words):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def session_prefix(session_id):
+    """Name prefix of the documents owned by a session"""
+    return f"Session {session_id:03d} document"
+
+def seed_documents(count, sessions, per_session, words, embeddings):
+    """Write shared and per-session synthetic documents, register them in the catalog and build the FAISS store"""
+    from langchain_community.vectorstores import FAISS
+    from utils import catalog
+    from utils.documents import DOCUMENTS_DIR, iter_document_chunks
+    from utils.vector_store import VECTOR_STORE_DIR
+
+    names = [(f"seed_{i:05d}.txt", f"Seed document {i}") for i in range(count)]
+    names += [
+        (f"session_{session_id:03d}_{j:03d}.txt", f"{session_prefix(session_id)} {j}")
+        for session_id in range(sessions)
+        for j in range(per_session)
+    ]
+    records = []
+    for i, (filename, original_name) in enumerate(names):
+        (DOCUMENTS_DIR / filename).write_text(random_text(i, words))
+        records.append({
+            "doc_id": filename,
+            "original_name": original_name,
+            "upload_date": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d} 12:00:00",
+            "size": (DOCUMENTS_DIR / filename).stat().st_size,
+            "status": "uploaded"
+        })
+    catalog.add_documents(records)
+
+    vector_store = None
+    for record in records:
+        for batch in iter_document_chunks(DOCUMENTS_DIR / record["doc_id"]):
+            if vector_store is None:
+                vector_store = FAISS.from_documents(batch, embeddings)
+            else:
+                vector_store.add_documents(batch)
+    vector_store.save_local(VECTOR_STORE_DIR)
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+def format_mb(size):
+    return f"{size / 1024 / 1024:.1f} MB"
+
+class RSSMonitor(threading.Thread):
+    """Sample the total resident set size of some processes in the background"""
+
+    def __init__(self, processes, interval=0.05):
+        super().__init__(daemon=True)
+        self.processes = processes
+        self.interval = interval
+        self.peak = self.total()
+        self._stopped = threading.Event()
+
+    def total(self):
+        rss = 0
+        for process in self.processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return rss
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, self.total())
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+class Session:
+    """One simulated user, driving its own AppTest session"""
+
+    def __init__(self, session_id, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.session_id = session_id
+        self.timeout = timeout
+        self.latencies = {}
+        self.errors = []
+        self.app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        self.app.secrets["mistral_api_key"] = "stub"
+        self.app.secrets["confluence_api_token"] = "stub"
+
+    def _timed(self, action, func):
+        start = time.perf_counter()
+        try:
+            func()
+            if self.app.exception:
+                raise RuntimeError(self.app.exception[0].message)
+        except Exception as e:
+            self.errors.append(f"{action}: {e}")
+        self.latencies.setdefault(action, []).append(time.perf_counter() - start)
+
+    def _widget(self, widgets, label):
+        return next(widget for widget in widgets if widget.label == label)
+
+    def open(self):
+        self._timed("app.open", lambda: self.app.run())
+
+    def ask_question(self, question):
+        self.app.sidebar.radio[0].set_value("Q&A Interface")
+        self._timed("qa.open", lambda: self.app.run())
+        self._timed("qa.question", lambda: self.app.chat_input[0].set_value(question).run())
+
+    def _search(self, text):
+        return self._widget(self.app.text_input, "Search documents").set_value(text).run()
+
+    def manage_documents(self, search, import_confluence):
+        self.app.sidebar.radio[0].set_value("Document Manager")
+        self._timed("manager.open", lambda: self.app.run())
+        if import_confluence:
+            self._timed("manager.fetch_confluence", lambda: self._widget(self.app.button, "Fetch Confluence Pages").click().run())
+            self._timed("manager.process_confluence", lambda: self._widget(self.app.button, "Process Pages and save to json").click().run())
+        self._timed("manager.search", lambda: self._search(search))
+        self._timed("manager.clear_search", lambda: self._search(""))
+        self._timed("manager.next_page", lambda: self._widget(self.app.number_input, "Page").increment().run())
+        # Only toggle the documents this session owns
+        self._timed("manager.search_own", lambda: self._search(session_prefix(self.session_id)))
+        self._timed("manager.bulk_disable", lambda: self._widget(self.app.button, "Disable Matching Documents").click().run())
+        self._timed("manager.bulk_enable", lambda: self._widget(self.app.button, "Enable Matching Documents").click().run())
+
+    def run(self, rounds, import_confluence=False):
+        rng = random.Random(self.session_id)
+        for round_index in range(rounds):
+            self.ask_question(rng.choice(QUESTIONS))
+            self.manage_documents(str(rng.randint(0, 9)), import_confluence=import_confluence and round_index == 0)
+
+    def history_bytes(self):
+        try:
+            return len(pickle.dumps(self.app.session_state["messages"]))
+        except KeyError:
+            return 0
+
+def run_session(session_id, args, workdir, barrier, results):
+    """Open and drive one session in this process, then send back its measurements"""
+    process = psutil.Process()
+    result = {"latencies": {}, "errors": [], "history_bytes": 0}
+    try:
+        # The app resolves its data directories relative to the working directory at import time
+        os.chdir(workdir)
+        sys.path.insert(0, str(REPO_ROOT))
+
+        import pages.qa_interface
+        import utils.query_confluence
+        import utils.vector_store
+
+        embeddings = StubEmbeddings(args.embed_latency)
+        llm = make_stub_llm(args.llm_latency)
+        confluence = make_stub_confluence(args.confluence_pages, args.confluence_latency)
+
+        with mock.patch.object(utils.vector_store, "get_mistral_embeddings", lambda: embeddings), \
+                mock.patch.object(pages.qa_interface, "get_mistral_llm", lambda: llm), \
+                mock.patch.object(utils.query_confluence, "requests", confluence):
+            result["imported_rss"] = process.memory_info().rss
+            monitor = RSSMonitor([process])
+            monitor.start()
+
+            session = Session(session_id, args.timeout)
+            session.open()
+            result["opened_rss"] = process.memory_info().rss
+
+            barrier.wait(timeout=args.timeout)
+            # Only the first session imports the Confluence space, as a single user would
+            session.run(args.rounds, import_confluence=session_id == 0)
+
+            result["final_rss"] = process.memory_info().rss
+            monitor.stop()
+            result["peak_rss"] = monitor.peak
+
+        result["latencies"] = session.latencies
+        result["errors"] = session.errors
+        result["history_bytes"] = session.history_bytes()
+    except Exception as e:
+        # Release the other sessions rather than leave them waiting for this one
+        barrier.abort()
+        result["errors"].append(f"session {session_id}: {e!r}")
+    results.put(result)
+
+def collect_results(results, workers):
+    """Wait for every session result, giving up on sessions whose process died"""
+    collected = []
+    while len(collected) < len(workers):
+        try:
+            collected.append(results.get(timeout=1))
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+    return collected
+
+def run(args):
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="badozinator-load-")).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # The app resolves its data directories relative to the working directory at import time
+    os.chdir(workdir)
+    sys.path.insert(0, str(REPO_ROOT))
+    (workdir / "data" / "confluence").mkdir(parents=True, exist_ok=True)
+
+    seed_documents(args.documents, args.sessions, args.session_documents, args.document_words, StubEmbeddings(0))
+
+    # Spawn fresh interpreters, a forked process would share the catalog connection opened while seeding
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.sessions + 1)
+    results = context.Queue()
+    workers = [
+        context.Process(target=run_session, args=(i, args, workdir, barrier, results))
+        for i in range(args.sessions)
+    ]
+    for worker in workers:
+        worker.start()
+    monitor = RSSMonitor([psutil.Process(worker.pid) for worker in workers])
+    monitor.start()
+
+    # Sessions start together once every process has opened the app
+    try:
+        barrier.wait(timeout=args.timeout)
+    except threading.BrokenBarrierError:
+        pass
+    start = time.perf_counter()
+    sessions = collect_results(results, workers)
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    for worker in workers:
+        worker.join()
+
+    latencies = {}
+    for session in sessions:
+        for action, samples in session["latencies"].items():
+            if action != "app.open":
+                latencies.setdefault(action, []).extend(samples)
+    errors = [error for session in sessions for error in session["errors"]]
+    if len(sessions) < len(workers):
+        errors.append(f"{len(workers) - len(sessions)} session processes exited without results")
+    total_actions = sum(len(samples) for samples in latencies.values())
+    questions = len(latencies.get("qa.question", []))
+
+    print(f"sessions={args.sessions} rounds={args.rounds} documents={args.documents} workdir={workdir}")
+    print(f"wall time: {elapsed:.2f} s")
+    print(f"throughput: {total_actions / elapsed:.1f} actions/s, {questions / elapsed:.2f} questions/s")
+    print(f"errors: {len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    print(f"{'action':<28}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for action, samples in sorted(latencies.items()):
+        print(
+            f"{action:<28}{len(samples):>7}"
+            f"{percentile_ms(samples, 50):>10.1f}{percentile_ms(samples, 90):>10.1f}"
+            f"{percentile_ms(samples, 99):>10.1f}{max(samples) * 1000:>10.1f}"
+        )
+
+    measured = [session for session in sessions if "peak_rss" in session]
+    if not measured:
+        return
+    def mean(key):
+        return sum(session[key] for session in measured) / len(measured)
+
+    print(f"rss per session process: {format_mb(mean('imported_rss'))} after imports, "
+          f"{format_mb(mean('opened_rss'))} after opening, {format_mb(mean('final_rss'))} final, "
+          f"{format_mb(max(session['peak_rss'] for session in measured))} peak")
+    print(f"rss of all session processes: peak {format_mb(monitor.peak)}")
+    print(f"per session: {format_mb(mean('opened_rss') - mean('imported_rss'))} to open, "
+          f"{format_mb(mean('final_rss') - mean('imported_rss'))} after the run, "
+          f"chat history {mean('history_bytes') / 1024:.1f} KB on average")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent user sessions")
+    parser.add_argument("--rounds", type=int, default=3, help="Q&A and Document Manager rounds per session")
+    parser.add_argument("--documents", type=int, default=200, help="synthetic documents seeded in the catalog")
+    parser.add_argument("--session-documents", type=int, default=5, help="synthetic documents owned by each session, bulk toggled by it")
+    parser.add_argument("--document-words", type=int, default=500, help="words per synthetic document")
+    parser.add_argument("--confluence-pages", type=int, default=20, help="pages in the stubbed Confluence space")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="seconds per stubbed embedding request")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per stubbed LLM answer")
+    parser.add_argument("--confluence-latency", type=float, default=0.2, help="seconds per stubbed Confluence request")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed for a single script run")
+    parser.add_argument("--workdir", help="scratch directory for app data, a new temporary one by default")
+    args = parser.parse_args()
+    run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# Document ingestion
+# Chunks are handed to the embedding step in batches of at most INGEST_BATCH_SIZE chunks
+# and INGEST_MAX_BATCH_BYTES of UTF-8 chunk text. This limit covers the buffered chunk text
+# only: ingesting a document also holds the page being split and the embeddings of one batch.
+# Plain text and PDFs are read incrementally, so none of this grows with the document. The
+# .docx, .doc and unstructured loaders extract the whole text first, which is held once in full
+INGEST_BATCH_SIZE = 256
+INGEST_MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+# Pages are cut into blocks of at most this many characters before being split into chunks
+TEXT_BLOCK_SIZE = 1024 * 1024
+
+# Retrieval reranking
+# Candidates fetched per query before maximal marginal relevance picks the final k
+RERANK_FETCH_K = 20
+# 1.0 ranks on relevance alone, 0.0 on diversity alone
+RERANK_LAMBDA_MULT = 0.5
+# Chunks preferred from a single document before others, more only fill slots left empty, None for no cap
+RERANK_MAX_PER_SOURCE = 2
+
+# Document manager
+# Documents listed per page
+DOCUMENT_PAGE_SIZE = 50
+# Confluence parent pages offered per search
+PARENT_PAGE_RESULTS = 20
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 from utils.documents import process_documents, get_document_status, delete_document, process_confluence_data
-from utils.vector_store import initialize_vector_store
+from utils.vector_store import initialize_vector_store, delete_document_vectors
 from utils.query_confluence import fetch_confluence_pages, process_directory
+from utils import catalog
+from config.config import DOCUMENT_PAGE_SIZE, PARENT_PAGE_RESULTS
+import math
 import os
 
 def show_document_manager():
@@ -24,12 +27,12 @@ def show_document_manager():
                 with st.spinner("Processing documents..."):
                     try:
                         # Process documents
-                        all_splits = process_documents(uploaded_files)
+                        processed_files = process_documents(uploaded_files)
                         
-                        # Initialize vector store
+                        # Index only the new documents
                         with st.spinner("Initializing vector store..."):
-                            st.session_state.retriever = initialize_vector_store()
-                            st.success("Vector store initialized successfully")
+                            if initialize_vector_store(processed_files):
+                                st.success("Vector store initialized successfully")
                     except Exception as e:
                         st.error(f"Error processing documents: {str(e)}")
     
@@ -38,10 +41,12 @@ def show_document_manager():
         if st.button("Fetch Confluence Pages"):
             fetch_confluence_pages()
         if st.button("Process Pages and save to json"):
-            process_directory(
+            documents = process_directory(
                 directory_path="./confluence_pages", 
                 output_file="./data/confluence/pratt_confluence.json"
                 )
+            # Index only the imported pages
+            initialize_vector_store([f"{doc['title']}.txt" for doc in documents])
         
         st.subheader("Process Confluence Data")
         if st.button("Process Confluence Data"):
@@ -50,42 +55,68 @@ def show_document_manager():
                 with st.spinner("Processing Confluence data..."):
                     all_splits = process_confluence_data(confluence_file)
                     if all_splits:
-                        # Initialize vector store
-                        st.session_state.retriever = initialize_vector_store()
+                        # Index only the imported pages
+                        initialize_vector_store([doc["metadata"]["source"] for doc in all_splits])
                         st.success("Confluence data processed successfully!")
             else:
                 st.error("Confluence data file not found")
     
-    # Initialize document metadata if not exists
-    if "document_metadata" not in st.session_state:
-        st.session_state.document_metadata = {}
-    
     # Document status section
     st.subheader("Document Status")
-    doc_status = get_document_status()
+    total_docs = catalog.count_documents()
     
-    if doc_status is not None and not doc_status.empty:
-        st.dataframe(doc_status)
+    if total_docs:
+        # Filters apply to the listing and to bulk enable/disable
+        search = st.text_input("Search documents")
+        col1, col2, col3 = st.columns(3)
+        doc_type = col1.selectbox("Source type", [None, "file", "confluence"], format_func=lambda t: t or "All")
+        # Only offer the parent pages matching a title search, Confluence spaces can be large
+        parent_search = col2.text_input("Find Confluence parent page")
+        parent_pages = dict(catalog.search_parent_pages(parent_search, limit=PARENT_PAGE_RESULTS))
+        parent_page_id = col2.selectbox(
+            "Confluence parent tree",
+            [None, *parent_pages],
+            format_func=lambda page_id: parent_pages.get(page_id, "All")
+        )
+        upload_dates = col3.date_input("Upload date", value=())
+        filters = {
+            "search": search,
+            "doc_type": doc_type,
+            "parent_page_id": parent_page_id,
+            "uploaded_from": upload_dates[0] if len(upload_dates) > 0 else None,
+            "uploaded_to": upload_dates[1] if len(upload_dates) > 1 else None
+        }
+        
+        matching_docs = catalog.count_documents(**filters)
+        page_count = max(1, math.ceil(matching_docs / DOCUMENT_PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+        st.caption(f"{matching_docs} of {total_docs} documents, page {page} of {page_count}")
+        
+        # Only the current page is loaded and rendered
+        doc_status = get_document_status(filters, page - 1)
+    
+    if total_docs and doc_status is not None:
+        with st.form("Enable/Disable Documents"):
+            edited_status = st.data_editor(
+                doc_status,
+                hide_index=True,
+                disabled=[column for column in doc_status.columns if column != "Enabled"]
+            )
+            btn = st.form_submit_button("Save Changes")
+        if btn:
+            changed = edited_status["Enabled"] != doc_status["Enabled"]
+            catalog.set_enabled_by_id(edited_status.loc[changed, "Enabled"].to_dict())
+            st.rerun()
             
         with st.expander("Document Management"):
-            with st.form("Enable/Disable Documents"):
-                use_all_docs = st.toggle("Use All Documents", value=False)
-                enabled_docs = {}
-                # Iterate over document metadata and create checkboxes for each on
-                for doc_id, metadata in st.session_state.document_metadata.items():
-                    enabled_docs[doc_id] = st.checkbox(
-                        metadata["original_name"],
-                        value=metadata.get("enabled", False),
-                        key=f"doc_enable_{doc_id}"
-                    )
-                btn = st.form_submit_button("Save Changes")
-            if btn:
-                for doc_id, bool_to_embbed in enabled_docs.items():
-                    if use_all_docs:
-                        st.session_state.document_metadata[doc_id]["enabled"] = True
-                    else:
-                        st.session_state.document_metadata[doc_id]["enabled"] = bool_to_embbed
-
+            with st.form("Bulk Enable/Disable Documents"):
+                st.write(f"Apply to all {matching_docs} documents matching the filters above")
+                col1, col2 = st.columns(2)
+                enable_btn = col1.form_submit_button("Enable Matching Documents")
+                disable_btn = col2.form_submit_button("Disable Matching Documents")
+            if enable_btn or disable_btn:
+                catalog.set_enabled(enable_btn, **filters)
+                st.rerun()
             
             # Delete document button
             with st.form("Delete Documents"):
@@ -93,18 +124,17 @@ def show_document_manager():
                 # Get selected documents
                 selected_docs = st.multiselect(
                     "Select documents to delete",
-                    doc_status["Original Name"].tolist()
+                    doc_status.index.tolist(),
+                    format_func=lambda doc_id: doc_status.at[doc_id, "Original Name"]
                 )
                 btn = st.form_submit_button("Delete Selected Documents")
             if btn:
-                # Find filename for each selected document
-                file_names_to_delete = [filename for filename, metadata in st.session_state.document_metadata.items() if metadata["original_name"] in selected_docs]
-                for filename in file_names_to_delete:
+                # Remove the documents' vectors in place instead of rebuilding the vector store
+                delete_document_vectors(selected_docs)
+                for filename in selected_docs:
                     delete_document(filename)
-                
-                # Reinitialize vector store
-                with st.spinner("Reinitializing vector store..."):
-                    st.session_state.retriever = initialize_vector_store()
-                    st.success("Vector store reinitialized successfully")
+                st.success(f"Deleted {len(selected_docs)} documents")
+    elif total_docs:
+        st.info("No documents match the filters")
     else:
         st.info("No documents have been processed yet")
\ No newline at end of file
@@ -3,39 +3,34 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains import create_retrieval_chain
 from utils.embeddings import get_mistral_llm
-from utils.vector_store import load_vector_store
+from utils.vector_store import load_vector_store, get_enabled_source_filter
+from utils import catalog
 import json
 
-def get_selected_documents():
-    """Return list of enabled document IDs"""
-    
-    enabled_docs = []
-    if "document_metadata" in st.session_state:
-        for doc_id, metadata in st.session_state.document_metadata.items():
-            if metadata["enabled"]:
-                enabled_docs.append(doc_id)
-    return enabled_docs
+@st.cache_resource(max_entries=1)
+def get_document_counts(catalog_version):
+    """Count processed and enabled documents, once per catalog version"""
+    return catalog.count_documents(status="processed"), catalog.count_documents(enabled=True)
 
 def show_qa_interface():
     st.title("Knowledge Base Q&A")
     
-    # Check if documents have been processed
-    if "documents_processed" not in st.session_state or not st.session_state.documents_processed:
+    processed_count, enabled_count = get_document_counts(catalog.get_version())
+    
+    # Check if documents have been processed, by any session
+    if not processed_count:
         st.info("Please process documents in the Document Manager first")
         return
     
     # Show document selector in sidebar
     try:
-        enabled_docs = get_selected_documents()
-        st.write(f"Selected documents: {enabled_docs}")
+        st.write(f"Selected documents: {enabled_count}")
     
-        # Get retriever with filtered documents
-        retriever = st.session_state.get("retriever")
+        # Get retriever filtered on the documents currently enabled in the catalog
+        retriever = load_vector_store(**get_enabled_source_filter())
         if not retriever:
-            retriever = load_vector_store(enabled_docs)
-            if not retriever:
-                st.error("Failed to load vector store")
-                return
+            st.error("Failed to load vector store")
+            return
     
     except Exception as e:
         retriever = load_vector_store()
@@ -0,0 +1,9 @@
+import pytest
+from utils import catalog
+
+@pytest.fixture
+def temp_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "CATALOG_PATH", tmp_path / "catalog.db")
+    catalog.get_catalog.clear()
+    yield
+    catalog.get_catalog.clear()
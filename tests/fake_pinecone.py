@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+import numpy as np
+
+# Pinecone caps the number of values in an $in or $nin filter
+MAX_FILTER_VALUES = 10000
+
+class FakeIndex:
+    """In-memory stand-in for a Pinecone index, covering the calls the app makes"""
+
+    def __init__(self):
+        self.namespaces = {}
+        self.calls = []
+
+    def upsert(self, vectors, namespace=""):
+        self.calls.append(("upsert", namespace, len(vectors)))
+        store = self.namespaces.setdefault(namespace, {})
+        for vector in vectors:
+            store[vector["id"]] = (list(vector["values"]), dict(vector.get("metadata") or {}))
+        return SimpleNamespace(upserted_count=len(vectors))
+
+    def delete(self, ids, namespace=""):
+        self.calls.append(("delete", namespace, len(ids)))
+        store = self.namespaces.get(namespace, {})
+        for vector_id in ids:
+            store.pop(vector_id, None)
+        if not store:
+            self.namespaces.pop(namespace, None)
+
+    def list(self, prefix=None, namespace="", limit=100):
+        ids = sorted(vector_id for vector_id in self.namespaces.get(namespace, {}) if vector_id.startswith(prefix or ""))
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def describe_index_stats(self):
+        return SimpleNamespace(namespaces={
+            namespace: SimpleNamespace(vector_count=len(store))
+            for namespace, store in self.namespaces.items()
+        })
+
+    def query(self, vector, top_k, namespace="", filter=None, include_metadata=False, include_values=False):
+        self.calls.append(("query", namespace, filter))
+        query = np.asarray(vector, dtype=np.float32)
+        matches = []
+        for vector_id, (values, metadata) in self.namespaces.get(namespace, {}).items():
+            if filter is not None and not _matches(metadata, filter):
+                continue
+            stored = np.asarray(values, dtype=np.float32)
+            score = float(stored @ query / max(np.linalg.norm(stored) * np.linalg.norm(query), 1e-12))
+            matches.append(SimpleNamespace(
+                id=vector_id,
+                score=score,
+                values=values if include_values else [],
+                metadata=metadata if include_metadata else None
+            ))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return SimpleNamespace(matches=matches[:top_k], namespace=namespace)
+
+def _matches(metadata, query_filter):
+    for key, condition in query_filter.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        value = metadata.get(key)
+        for operator, operand in condition.items():
+            if operator in ("$in", "$nin") and len(operand) > MAX_FILTER_VALUES:
+                raise ValueError(f"{operator} accepts at most {MAX_FILTER_VALUES} values")
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+    return True
@@ -0,0 +1,55 @@
+import sqlite3
+from utils import catalog
+
+def add_document(doc_id, name, **fields):
+    catalog.add_document(doc_id, original_name=name, upload_date="2026-10-19 00:00:00", status="processed", **fields)
+
+def test_search_matches_names_containing_the_text(temp_catalog):
+    add_document("a.pdf", "Pump maintenance manual")
+    add_document("b.pdf", "Controller reset procedure")
+    add_document("c.pdf", "100% coverage_report")
+
+    assert catalog.count_documents(search="MAINTENANCE") == 1
+    assert [doc["doc_id"] for doc in catalog.list_documents(search="reset proc")] == ["b.pdf"]
+    assert [doc["doc_id"] for doc in catalog.list_documents(search="% cov")] == ["c.pdf"]
+
+def test_short_search_matches_name_prefixes(temp_catalog):
+    add_document("a.pdf", "Pump manual")
+    add_document("b.pdf", "Spare pump list")
+
+    assert [doc["doc_id"] for doc in catalog.list_documents(search="pu")] == ["a.pdf"]
+
+def test_search_follows_renamed_and_removed_documents(temp_catalog):
+    add_document("a.pdf", "Pump manual")
+    add_document("a.pdf", "Valve manual")
+    add_document("b.pdf", "Pump checklist")
+    catalog.remove_document("b.pdf")
+
+    assert catalog.count_documents(search="pump") == 0
+    assert catalog.count_documents(search="valve") == 1
+
+def test_search_index_is_built_for_an_existing_catalog(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE documents (doc_id TEXT PRIMARY KEY, original_name TEXT NOT NULL, upload_date TEXT NOT NULL, size INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, chunks INTEGER NOT NULL DEFAULT 0, processing_error TEXT, type TEXT NOT NULL DEFAULT 'file', page_id TEXT, parent_id TEXT, enabled INTEGER NOT NULL DEFAULT 1)")
+    conn.execute("INSERT INTO documents (doc_id, original_name, upload_date, status) VALUES ('a.pdf', 'Pump manual', '2026-10-19', 'processed')")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(catalog, "CATALOG_PATH", path)
+    catalog.get_catalog.clear()
+    try:
+        assert catalog.count_documents(search="pump") == 1
+    finally:
+        catalog.get_catalog.clear()
+
+def test_parent_page_search_is_limited(temp_catalog):
+    add_document("root.txt", "Engineering", type="confluence", page_id="1", parent_id="root")
+    for i in range(5):
+        add_document(f"team_{i}.txt", f"Team {i}", type="confluence", page_id=f"1{i}", parent_id="1")
+        add_document(f"note_{i}.txt", f"Team {i} notes", type="confluence", page_id=f"10{i}", parent_id=f"1{i}")
+
+    assert catalog.search_parent_pages("engin") == [("1", "Engineering")]
+    assert catalog.search_parent_pages("team", limit=3) == [("10", "Team 0"), ("11", "Team 1"), ("12", "Team 2")]
+    # Leaf pages are not offered as parents
+    assert catalog.search_parent_pages("notes") == []
@@ -0,0 +1,55 @@
+from langchain_core.documents import Document
+from utils import catalog, documents
+from utils.documents import iter_document_chunks, iter_document_pages, iter_text_pages
+
+def test_text_pages_are_bounded_without_line_breaks(tmp_path):
+    # Confluence exports are written as a single line
+    text = " ".join(f"word{i}" for i in range(5000))
+    file_path = tmp_path / "page.txt"
+    file_path.write_text(text)
+
+    pages = [page.page_content for page in iter_text_pages(file_path, block_size=1000)]
+
+    assert len(pages) > 1
+    assert all(len(page) <= 1000 for page in pages)
+    assert "".join(pages) == text
+    # Blocks are cut between words
+    assert all(page.endswith(" ") for page in pages[:-1])
+
+def test_text_pages_cut_unbroken_text(tmp_path):
+    file_path = tmp_path / "blob.txt"
+    file_path.write_text("x" * 2500)
+
+    pages = [page.page_content for page in iter_text_pages(file_path, block_size=1000)]
+
+    assert [len(page) for page in pages] == [1000, 1000, 500]
+
+def test_chunk_batches_stay_under_the_byte_limit(tmp_path, temp_catalog):
+    file_path = tmp_path / "doc.txt"
+    file_path.write_text("\n\n".join(" ".join(f"w{p}x{i}" for i in range(150)) for p in range(40)))
+    catalog.add_document("doc.txt", original_name="doc.txt", upload_date="2026-10-19 00:00:00", status="uploaded")
+
+    batches = list(iter_document_chunks(file_path, batch_size=100, max_batch_bytes=3000))
+
+    assert len(batches) > 1
+    assert all(sum(len(chunk.page_content.encode("utf-8")) for chunk in batch) <= 3000 for batch in batches)
+    chunk_indexes = [chunk.metadata["chunk_index"] for batch in batches for chunk in batch]
+    assert chunk_indexes == list(range(len(chunk_indexes)))
+    assert catalog.get_document("doc.txt")["chunks"] == len(chunk_indexes)
+
+def test_whole_document_loaders_are_cut_into_blocks(tmp_path, monkeypatch):
+    # Docx2txtLoader and UnstructuredFileLoader yield the whole document as one page
+    text = "\n".join(f"paragraph {i} " + "word " * 40 for i in range(200))
+
+    class WholeDocumentLoader:
+        def lazy_load(self):
+            yield Document(page_content=text, metadata={"source": "report.docx"})
+
+    monkeypatch.setattr(documents, "get_document_loader", lambda file_path: WholeDocumentLoader())
+
+    pages = list(iter_document_pages(tmp_path / "report.docx", block_size=5000))
+
+    assert len(pages) > 1
+    assert all(len(page.page_content) <= 5000 for page in pages)
+    assert "".join(page.page_content for page in pages) == text
+    assert all(page.metadata == {"source": "report.docx"} for page in pages)
@@ -0,0 +1,47 @@
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from utils.faiss_store import FAISSRetriever
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=16)
+
+def make_store():
+    # The disabled document repeats the query, so all its chunks rank first
+    documents = [Document(page_content="query", metadata={"source": "disabled.pdf"}) for _ in range(30)]
+    documents += [Document(page_content=f"other {i}", metadata={"source": f"doc_{i}.pdf"}) for i in range(10)]
+    return FAISS.from_documents(documents, EMBEDDINGS)
+
+def test_excluded_sources_are_filtered_beyond_fetch_k():
+    retriever = FAISSRetriever(
+        vector_store=make_store(),
+        embeddings=EMBEDDINGS,
+        k=5,
+        fetch_k=10,
+        excluded_sources={"disabled.pdf"}
+    )
+    documents = retriever.invoke("query")
+
+    assert len(documents) == 5
+    assert "disabled.pdf" not in {doc.metadata["source"] for doc in documents}
+
+def test_sources_restrict_the_candidates():
+    retriever = FAISSRetriever(
+        vector_store=make_store(),
+        embeddings=EMBEDDINGS,
+        k=5,
+        fetch_k=10,
+        sources={"doc_1.pdf", "doc_2.pdf"}
+    )
+    documents = retriever.invoke("query")
+
+    assert {doc.metadata["source"] for doc in documents} == {"doc_1.pdf", "doc_2.pdf"}
+
+def test_single_document_corpus_returns_k_chunks():
+    documents = [Document(page_content=f"chunk {i}", metadata={"source": "manual.pdf"}) for i in range(10)]
+    retriever = FAISSRetriever(
+        vector_store=FAISS.from_documents(documents, EMBEDDINGS),
+        embeddings=EMBEDDINGS,
+        k=5
+    )
+
+    assert len(retriever.invoke("chunk 3")) == 5
@@ -0,0 +1,109 @@
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from utils.pinecone_store import (
+    PineconeRetriever,
+    chunk_id,
+    delete_documents,
+    list_namespaces,
+    prune_document,
+    upsert_documents
+)
+from utils import pinecone_store
+from tests.fake_pinecone import FakeIndex
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=16)
+
+def make_chunks(source, count, doc_type=None):
+    chunks = []
+    for i in range(count):
+        metadata = {"source": source, "original_name": source, "chunk_index": i}
+        if doc_type:
+            metadata["type"] = doc_type
+        chunks.append(Document(page_content=f"{source} chunk {i}", metadata=metadata))
+    return chunks
+
+def stored_ids(index, namespace="file"):
+    return set(index.namespaces.get(namespace, {}))
+
+def test_rebuild_reuses_chunk_ids():
+    index = FakeIndex()
+    chunks = make_chunks("a.pdf", 3) + make_chunks("b.txt", 2)
+
+    assert upsert_documents(index, chunks, EMBEDDINGS) == 5
+    first_ids = stored_ids(index)
+    upsert_documents(index, chunks, EMBEDDINGS)
+
+    assert stored_ids(index) == first_ids
+    assert first_ids == {chunk_id("a.pdf", i) for i in range(3)} | {chunk_id("b.txt", i) for i in range(2)}
+
+def test_shorter_reingest_prunes_stale_chunks():
+    index = FakeIndex()
+    upsert_documents(index, make_chunks("a.pdf", 5), EMBEDDINGS)
+
+    chunk_count = upsert_documents(index, make_chunks("a.pdf", 2), EMBEDDINGS)
+    prune_document(index, "a.pdf", "file", chunk_count)
+
+    assert stored_ids(index) == {chunk_id("a.pdf", 0), chunk_id("a.pdf", 1)}
+
+def test_delete_removes_only_the_document_vectors():
+    index = FakeIndex()
+    upsert_documents(index, make_chunks("a.pdf", 3) + make_chunks("b.txt", 2), EMBEDDINGS)
+    upsert_documents(index, make_chunks("page.txt", 2, doc_type="confluence"), EMBEDDINGS)
+
+    delete_documents(index, {"a.pdf": "file", "page.txt": "confluence"})
+
+    assert stored_ids(index) == {chunk_id("b.txt", 0), chunk_id("b.txt", 1)}
+    assert list_namespaces(index) == ["file"]
+
+def test_source_filter_excludes_disabled_documents():
+    index = FakeIndex()
+    upsert_documents(index, make_chunks("enabled.pdf", 3) + make_chunks("disabled.pdf", 3), EMBEDDINGS)
+    upsert_documents(index, make_chunks("page.txt", 3, doc_type="confluence"), EMBEDDINGS)
+
+    retriever = PineconeRetriever(
+        index=index,
+        embeddings=EMBEDDINGS,
+        namespaces=list_namespaces(index),
+        k=10,
+        sources=["enabled.pdf", "page.txt"],
+        max_per_source=None
+    )
+    documents = retriever.invoke("disabled.pdf chunk 0")
+
+    assert {doc.metadata["source"] for doc in documents} == {"enabled.pdf", "page.txt"}
+    assert all(call[2] == {"source": {"$in": ["enabled.pdf", "page.txt"]}} for call in index.calls if call[0] == "query")
+
+def test_excluded_sources_use_a_nin_filter():
+    index = FakeIndex()
+    upsert_documents(index, make_chunks("enabled.pdf", 3) + make_chunks("disabled.pdf", 3), EMBEDDINGS)
+
+    retriever = PineconeRetriever(
+        index=index,
+        embeddings=EMBEDDINGS,
+        namespaces=list_namespaces(index),
+        k=10,
+        excluded_sources=["disabled.pdf"],
+        max_per_source=None
+    )
+    documents = retriever.invoke("disabled.pdf chunk 0")
+
+    assert {doc.metadata["source"] for doc in documents} == {"enabled.pdf"}
+    assert [call[2] for call in index.calls if call[0] == "query"] == [{"source": {"$nin": ["disabled.pdf"]}}]
+
+def test_long_source_lists_are_split_over_queries(monkeypatch):
+    monkeypatch.setattr(pinecone_store, "MAX_FILTER_VALUES", 2)
+    index = FakeIndex()
+    upsert_documents(index, make_chunks("a.pdf", 2) + make_chunks("b.pdf", 2) + make_chunks("c.pdf", 2), EMBEDDINGS)
+
+    retriever = PineconeRetriever(
+        index=index,
+        embeddings=EMBEDDINGS,
+        namespaces=list_namespaces(index),
+        k=10,
+        sources=["a.pdf", "b.pdf", "c.pdf"],
+        max_per_source=None
+    )
+    documents = retriever.invoke("c.pdf chunk 0")
+
+    assert len(documents) == 6
+    assert sorted(len(call[2]["source"]["$in"]) for call in index.calls if call[0] == "query") == [1, 2]
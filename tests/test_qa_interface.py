@@ -0,0 +1,21 @@
+from streamlit.testing.v1 import AppTest
+from utils import catalog
+
+def show_qa_interface():
+    from pages.qa_interface import show_qa_interface
+    show_qa_interface()
+
+def test_qa_waits_for_processed_documents(temp_catalog):
+    catalog.add_document("a.pdf", original_name="a.pdf", upload_date="2026-10-19 00:00:00", status="uploaded")
+
+    app = AppTest.from_function(show_qa_interface).run()
+
+    assert app.info[0].value == "Please process documents in the Document Manager first"
+
+def test_qa_opens_for_documents_processed_in_another_session(temp_catalog):
+    catalog.add_document("a.pdf", original_name="a.pdf", upload_date="2026-10-19 00:00:00", status="processed")
+
+    app = AppTest.from_function(show_qa_interface).run()
+
+    assert not app.info
+    assert app.markdown[0].value == "Selected documents: 1"
@@ -0,0 +1,15 @@
+from utils import catalog
+from utils.query_confluence import process_directory
+
+def test_process_directory_processes_every_page(tmp_path, temp_catalog, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "documents").mkdir(parents=True)
+    pages_dir = tmp_path / "pages"
+    pages_dir.mkdir()
+    (pages_dir / "12_1_Runbook.html").write_text("<div id='main-content'><p>" + "restart the pump " * 300 + "</p></div>")
+
+    documents = process_directory(str(pages_dir), str(tmp_path / "pages.json"))
+
+    record = catalog.get_document(f"{documents[0]['title']}.txt")
+    assert record["status"] == "processed"
+    assert record["chunks"] > 1
@@ -0,0 +1,40 @@
+from utils.rerank import maximal_marginal_relevance
+
+QUERY = [1.0, 0.0, 0.0]
+
+# The best match, a near-duplicate of it, then a less relevant but different candidate
+VECTORS = [
+    [0.9, 0.436, 0.0],
+    [0.89, 0.45, 0.0],
+    [0.8, -0.6, 0.0]
+]
+
+def test_near_duplicates_give_way_to_diverse_candidates():
+    assert maximal_marginal_relevance(QUERY, VECTORS, k=2, lambda_mult=0.5) == [0, 2]
+
+def test_lambda_one_keeps_relevance_order():
+    assert maximal_marginal_relevance(QUERY, VECTORS, k=3, lambda_mult=1.0) == [0, 1, 2]
+
+def test_capped_sources_give_way_to_other_sources():
+    vectors = [[1.0, 0.1 * i, 0.0] for i in range(4)]
+    sources = ["a.pdf", "a.pdf", "a.pdf", "b.pdf"]
+
+    selected = maximal_marginal_relevance(QUERY, vectors, k=3, lambda_mult=1.0, sources=sources, max_per_source=2)
+
+    assert selected == [0, 1, 3]
+
+def test_capped_sources_fill_slots_once_other_sources_run_out():
+    vectors = [[1.0, 0.1 * i, 0.0] for i in range(4)]
+    sources = ["a.pdf", "a.pdf", "a.pdf", "b.pdf"]
+
+    selected = maximal_marginal_relevance(QUERY, vectors, k=4, lambda_mult=1.0, sources=sources, max_per_source=2)
+
+    assert selected == [0, 1, 3, 2]
+
+def test_single_source_still_returns_k_candidates():
+    vectors = [[1.0, 0.1 * i, 0.05 * i] for i in range(10)]
+
+    selected = maximal_marginal_relevance(QUERY, vectors, k=5, sources=["a.pdf"] * 10, max_per_source=2)
+
+    assert len(selected) == 5
+    assert len(set(selected)) == 5
@@ -0,0 +1,137 @@
+import pytest
+import streamlit as st
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from utils import catalog, vector_store
+from utils.pinecone_store import chunk_id
+from utils.vector_store import delete_document_vectors, get_enabled_source_filter, initialize_vector_store, load_vector_store
+from tests.fake_pinecone import FakeIndex
+
+class RecordingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings remembering every text embedded for documents"""
+
+    def embed_documents(self, texts):
+        EMBEDDED.extend(texts)
+        return super().embed_documents(texts)
+
+EMBEDDED = []
+
+@pytest.fixture
+def temp_store(tmp_path, monkeypatch, temp_catalog):
+    documents_dir = tmp_path / "documents"
+    documents_dir.mkdir()
+    monkeypatch.setattr(vector_store, "DOCUMENTS_DIR", documents_dir)
+    monkeypatch.setattr(vector_store, "VECTOR_STORE_DIR", tmp_path / "vector_store")
+    monkeypatch.setattr(vector_store, "get_mistral_embeddings", lambda: RecordingEmbeddings(size=16))
+    EMBEDDED.clear()
+    yield documents_dir
+    st.session_state.clear()
+
+def add_processed_document(documents_dir, filename):
+    (documents_dir / filename).write_text(f"{filename} contents")
+    catalog.add_document(filename, original_name=filename, upload_date="2026-10-19 00:00:00", status="processed")
+
+def saved_sources():
+    store = FAISS.load_local(vector_store.VECTOR_STORE_DIR, RecordingEmbeddings(size=16), allow_dangerous_deserialization=True)
+    return sorted(doc.metadata["source"] for doc in store.docstore._dict.values())
+
+def add_documents(count, enabled):
+    catalog.add_documents([
+        {"doc_id": f"{'on' if enabled else 'off'}_{i}.txt", "original_name": f"Document {i}", "upload_date": "2026-10-19 00:00:00", "status": "processed", "enabled": int(enabled)}
+        for i in range(count)
+    ])
+
+def test_source_filter_excludes_the_few_disabled_documents(temp_catalog):
+    add_documents(5, enabled=True)
+    add_documents(2, enabled=False)
+
+    assert get_enabled_source_filter() == {"excluded_sources": ["off_0.txt", "off_1.txt"]}
+
+def test_source_filter_includes_the_few_enabled_documents(temp_catalog):
+    add_documents(2, enabled=True)
+    add_documents(5, enabled=False)
+
+    assert get_enabled_source_filter() == {"sources": ["on_0.txt", "on_1.txt"]}
+
+def test_source_filter_is_empty_when_everything_is_enabled(temp_catalog):
+    add_documents(3, enabled=True)
+
+    assert get_enabled_source_filter() == {"excluded_sources": None}
+
+def test_source_filter_is_memoized_until_the_catalog_changes(temp_catalog, monkeypatch):
+    add_documents(3, enabled=True)
+    add_documents(1, enabled=False)
+    counts = []
+    count_documents = catalog.count_documents
+    monkeypatch.setattr(catalog, "count_documents", lambda **filters: counts.append(filters) or count_documents(**filters))
+
+    assert get_enabled_source_filter() == get_enabled_source_filter() == {"excluded_sources": ["off_0.txt"]}
+    assert len(counts) == 2
+
+    catalog.set_enabled(False, search="Document 2")
+
+    assert sorted(get_enabled_source_filter()["excluded_sources"]) == ["off_0.txt", "on_2.txt"]
+    assert len(counts) == 4
+
+def test_faiss_indexes_only_the_new_documents(temp_store):
+    add_processed_document(temp_store, "a.txt")
+    initialize_vector_store()
+    add_processed_document(temp_store, "b.txt")
+    EMBEDDED.clear()
+
+    initialize_vector_store(["b.txt"])
+
+    assert EMBEDDED == ["b.txt contents"]
+    assert saved_sources() == ["a.txt", "b.txt"]
+
+def test_faiss_reindexing_a_document_replaces_its_chunks(temp_store):
+    add_processed_document(temp_store, "a.txt")
+    initialize_vector_store()
+
+    initialize_vector_store(["a.txt"])
+
+    assert saved_sources() == ["a.txt"]
+
+def test_faiss_delete_removes_only_the_document_vectors(temp_store):
+    add_processed_document(temp_store, "a.txt")
+    add_processed_document(temp_store, "b.txt")
+    initialize_vector_store()
+    EMBEDDED.clear()
+
+    delete_document_vectors(["a.txt"])
+
+    assert EMBEDDED == []
+    assert saved_sources() == ["b.txt"]
+
+def test_pinecone_upserts_only_the_new_documents(temp_store, monkeypatch):
+    index = FakeIndex()
+    monkeypatch.setattr(vector_store, "get_pinecone_index", lambda: index)
+    st.session_state["use_pinecone"] = True
+    add_processed_document(temp_store, "a.txt")
+    initialize_vector_store()
+    add_processed_document(temp_store, "b.txt")
+    EMBEDDED.clear()
+
+    initialize_vector_store(["b.txt"])
+
+    assert EMBEDDED == ["b.txt contents"]
+    assert set(index.namespaces["file"]) == {chunk_id("a.txt", 0), chunk_id("b.txt", 0)}
+
+def test_pinecone_namespaces_are_cached_until_documents_are_indexed(temp_store, monkeypatch):
+    index = FakeIndex()
+    monkeypatch.setattr(vector_store, "get_pinecone_index", lambda: index)
+    st.session_state["use_pinecone"] = True
+    st.session_state["pinecone_index"] = "test"
+    vector_store.get_namespaces.clear()
+    add_processed_document(temp_store, "a.txt")
+    initialize_vector_store()
+
+    assert load_vector_store().namespaces == ["file"]
+    index.namespaces["other"] = {}
+    assert load_vector_store().namespaces == ["file"]
+
+    catalog.add_document("page.txt", original_name="page", upload_date="2026-10-19 00:00:00", status="processed", type="confluence")
+    (temp_store / "page.txt").write_text("page contents")
+    initialize_vector_store(["page.txt"])
+
+    assert load_vector_store().namespaces == ["confluence", "file", "other"]
@@ -0,0 +1,248 @@
+import sqlite3
+import threading
+from datetime import timedelta
+from pathlib import Path
+import streamlit as st
+
+# Document catalog database, shared by every session
+CATALOG_PATH = Path("./data/catalog.db")
+CATALOG_PATH.parent.mkdir(exist_ok=True, parents=True)
+
+COLUMNS = [
+    "doc_id",
+    "original_name",
+    "upload_date",
+    "size",
+    "status",
+    "chunks",
+    "processing_error",
+    "type",
+    "page_id",
+    "parent_id",
+    "enabled"
+]
+
+# Values of columns left out of a new record
+DEFAULTS = {
+    "size": 0,
+    "chunks": 0,
+    "type": "file",
+    "enabled": 1
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    original_name TEXT NOT NULL,
+    upload_date TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    processing_error TEXT,
+    type TEXT NOT NULL DEFAULT 'file',
+    page_id TEXT,
+    parent_id TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_documents_name ON documents (original_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_documents_upload_date ON documents (upload_date);
+CREATE INDEX IF NOT EXISTS idx_documents_type ON documents (type, upload_date);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents (status);
+CREATE INDEX IF NOT EXISTS idx_documents_enabled ON documents (enabled);
+CREATE INDEX IF NOT EXISTS idx_documents_page ON documents (page_id);
+CREATE INDEX IF NOT EXISTS idx_documents_parent ON documents (parent_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    original_name, content='documents', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, original_name) VALUES (new.rowid, new.original_name);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, original_name) VALUES ('delete', old.rowid, old.original_name);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF original_name ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, original_name) VALUES ('delete', old.rowid, old.original_name);
+    INSERT INTO documents_fts (rowid, original_name) VALUES (new.rowid, new.original_name);
+END;
+"""
+
+# The trigram tokenizer only matches terms of at least three characters
+MIN_FTS_LENGTH = 3
+
+# Streamlit serves sessions from several threads over a single connection
+_lock = threading.Lock()
+
+# Bumped on every write through this module, so results derived from the catalog can be memoized
+_generation = 0
+
+@st.cache_resource
+def get_catalog():
+    """Get the connection to the document catalog, creating its schema if needed"""
+    conn = sqlite3.connect(CATALOG_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'documents_fts'").fetchone()
+    conn.executescript(SCHEMA)
+    if not has_fts:
+        # Index names of documents cataloged before the search table existed
+        with conn:
+            conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+    return conn
+
+def _execute(query, params=()):
+    global _generation
+    with _lock:
+        conn = get_catalog()
+        with conn:
+            cursor = conn.execute(query, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+            if cursor.rowcount > 0:
+                _generation += 1
+            return rows, cursor.rowcount
+
+def _execute_many(query, rows):
+    global _generation
+    with _lock:
+        conn = get_catalog()
+        with conn:
+            conn.executemany(query, rows)
+            _generation += 1
+
+def get_version():
+    """Get a value that changes whenever the catalog is written, by this process or another"""
+    # data_version only moves for commits made through other connections
+    rows, _ = _execute("PRAGMA data_version")
+    return _generation, rows[0]["data_version"]
+
+def _name_clause(search):
+    """Build the condition matching document names containing the search text"""
+    if len(search) >= MIN_FTS_LENGTH:
+        # Match the whole text as one phrase in the full text index
+        return "documents.rowid IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)", '"' + search.replace('"', '""') + '"'
+    # Too short for trigrams, fall back to a name prefix served by the name index
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return "documents.original_name LIKE ? ESCAPE '\\'", f"{escaped}%"
+
+def _where(search=None, doc_type=None, parent_page_id=None, uploaded_from=None, uploaded_to=None, status=None, enabled=None):
+    """Build the WHERE clause matching the document listing filters"""
+    clauses = []
+    params = []
+    if search:
+        clause, param = _name_clause(search)
+        clauses.append(clause)
+        params.append(param)
+    if doc_type:
+        clauses.append("type = ?")
+        params.append(doc_type)
+    if parent_page_id:
+        # The parent page and every page below it
+        clauses.append("""page_id IN (
+            WITH RECURSIVE tree(page_id) AS (
+                VALUES (?)
+                UNION
+                SELECT documents.page_id FROM documents JOIN tree ON documents.parent_id = tree.page_id
+            )
+            SELECT page_id FROM tree
+        )""")
+        params.append(parent_page_id)
+    if uploaded_from:
+        clauses.append("upload_date >= ?")
+        params.append(uploaded_from.isoformat())
+    if uploaded_to:
+        clauses.append("upload_date < ?")
+        params.append((uploaded_to + timedelta(days=1)).isoformat())
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if enabled is not None:
+        clauses.append("enabled = ?")
+        params.append(int(enabled))
+
+    if not clauses:
+        return "", params
+    return "WHERE " + " AND ".join(clauses), params
+
+def add_documents(records):
+    """Add or replace catalog records, each a dict keyed by catalog column"""
+    rows = [tuple(record.get(column, DEFAULTS.get(column)) for column in COLUMNS) for record in records]
+    columns = ", ".join(COLUMNS)
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    # Update existing rows in place, so they keep their rowid in the search index
+    updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS if column != "doc_id")
+    _execute_many(
+        f"INSERT INTO documents ({columns}) VALUES ({placeholders}) ON CONFLICT (doc_id) DO UPDATE SET {updates}",
+        rows
+    )
+
+def add_document(doc_id, **fields):
+    """Add or replace a single catalog record"""
+    add_documents([{"doc_id": doc_id, **fields}])
+
+def update_document(doc_id, **fields):
+    """Update some fields of a catalog record"""
+    assignments = ", ".join(f"{column} = ?" for column in fields if column in COLUMNS)
+    params = [value for column, value in fields.items() if column in COLUMNS]
+    _execute(f"UPDATE documents SET {assignments} WHERE doc_id = ?", (*params, doc_id))
+
+def get_document(doc_id):
+    """Get a catalog record as a dict, or None if unknown"""
+    rows, _ = _execute("SELECT * FROM documents WHERE doc_id = ?", (doc_id,))
+    return rows[0] if rows else None
+
+def remove_document(doc_id):
+    """Remove a catalog record"""
+    _execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+def get_document_ids(status=None, enabled=None):
+    """Get ids of documents, optionally restricted to a status or enabled state"""
+    where, params = _where(status=status, enabled=enabled)
+    rows, _ = _execute(f"SELECT doc_id FROM documents {where}", params)
+    return [row["doc_id"] for row in rows]
+
+def count_documents(**filters):
+    """Count documents matching the listing filters"""
+    where, params = _where(**filters)
+    rows, _ = _execute(f"SELECT COUNT(*) AS total FROM documents {where}", params)
+    return rows[0]["total"]
+
+def list_documents(offset=0, limit=50, **filters):
+    """List one page of documents matching the listing filters, newest first"""
+    where, params = _where(**filters)
+    rows, _ = _execute(
+        f"SELECT * FROM documents {where} ORDER BY upload_date DESC, doc_id LIMIT ? OFFSET ?",
+        (*params, limit, offset)
+    )
+    return rows
+
+def search_parent_pages(search="", limit=20):
+    """List Confluence pages with child pages whose title contains the search text, as (page_id, title) pairs"""
+    clauses = [
+        "documents.page_id IS NOT NULL",
+        "EXISTS (SELECT 1 FROM documents AS child WHERE child.parent_id = documents.page_id)"
+    ]
+    params = []
+    if search:
+        clause, param = _name_clause(search)
+        clauses.append(clause)
+        params.append(param)
+    rows, _ = _execute(
+        f"""SELECT page_id, original_name FROM documents
+        WHERE {" AND ".join(clauses)}
+        ORDER BY original_name COLLATE NOCASE LIMIT ?""",
+        (*params, limit)
+    )
+    return [(row["page_id"], row["original_name"]) for row in rows]
+
+def set_enabled(enabled, **filters):
+    """Enable or disable every document matching the listing filters, return how many changed"""
+    where, params = _where(**filters)
+    condition = f"{where} AND enabled != ?" if where else "WHERE enabled != ?"
+    _, rowcount = _execute(f"UPDATE documents SET enabled = ? {condition}", (int(enabled), *params, int(enabled)))
+    return rowcount
+
+def set_enabled_by_id(changes):
+    """Apply a mapping of document id to enabled state"""
+    _execute_many(
+        "UPDATE documents SET enabled = ? WHERE doc_id = ?",
+        [(int(enabled), doc_id) for doc_id, enabled in changes.items()]
+    )
@@ -11,7 +11,10 @@ from langchain_community.document_loaders import (
     Docx2txtLoader,
     UnstructuredFileLoader
 )
+from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from config.config import INGEST_BATCH_SIZE, INGEST_MAX_BATCH_BYTES, TEXT_BLOCK_SIZE, DOCUMENT_PAGE_SIZE
+from utils import catalog
 
 # Set up document storage
 DOCUMENTS_DIR = Path("./data/documents")
@@ -30,16 +33,14 @@ def save_uploaded_file(uploaded_file):
         f.write(uploaded_file.getbuffer())
     
     # Store metadata
-    if "document_metadata" not in st.session_state:
-        st.session_state.document_metadata = {}
-    
-    st.session_state.document_metadata[filename] = {
-        "original_name": uploaded_file.name,
-        "upload_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "size": uploaded_file.size,
-        "status": "uploaded",
-        "processing_error": None
-    }
+    catalog.add_document(
+        filename,
+        original_name=uploaded_file.name,
+        upload_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        size=uploaded_file.size,
+        status="uploaded",
+        processing_error=None
+    )
     
     return file_path
 
@@ -57,19 +58,73 @@ def get_document_loader(file_path):
         # Fall back to unstructured loader for other file types
         return UnstructuredFileLoader(str(file_path))
 
-def process_document(file_path):
-    """Process a document and return its chunks"""
-    try:
-        # Get appropriate loader
-        loader = get_document_loader(file_path)
+def _iter_blocks(read, block_size):
+    """Read text through read(size) in blocks of at most block_size characters"""
+    remainder = ""
+    while block := read(block_size - len(remainder)):
+        text = remainder + block
+        
+        # Cut after the last paragraph, line or word break in the second half of the block,
+        # carrying the tail over to the next block
+        cut = len(text)
+        for separator in ("\n\n", "\n", " ", "\t"):
+            position = text.rfind(separator)
+            if position >= len(text) // 2:
+                cut = position + len(separator)
+                break
         
-        # Load document
-        documents = loader.load()
+        yield text[:cut]
+        remainder = text[cut:]
+    
+    if remainder:
+        yield remainder
+
+def _string_reader(text):
+    """Read a string in successive slices, without copying it whole"""
+    position = 0
+    
+    def read(size):
+        nonlocal position
+        block = text[position:position + size]
+        position += len(block)
+        return block
+    
+    return read
+
+def iter_text_pages(file_path, block_size=TEXT_BLOCK_SIZE):
+    """Lazily read a text file as documents of at most block_size characters"""
+    with open(file_path) as f:
+        for block in _iter_blocks(f.read, block_size):
+            yield Document(page_content=block, metadata={"source": str(file_path)})
+
+def iter_document_pages(file_path, block_size=TEXT_BLOCK_SIZE):
+    """Lazily load the pages of a document, as documents of at most block_size characters
+
+    Only .txt files and PDFs are read incrementally. The .docx, .doc and unstructured loaders
+    extract the whole text at once, which is then cut into blocks so chunks are still built one
+    block at a time.
+    """
+    if os.path.splitext(file_path)[1].lower() == ".txt":
+        yield from iter_text_pages(file_path, block_size)
+        return
+    
+    for page in get_document_loader(file_path).lazy_load():
+        if len(page.page_content) <= block_size:
+            yield page
+            continue
+        for block in _iter_blocks(_string_reader(page.page_content), block_size):
+            yield Document(page_content=block, metadata=dict(page.metadata))
+
+def iter_document_chunks(file_path, batch_size=INGEST_BATCH_SIZE, max_batch_bytes=INGEST_MAX_BATCH_BYTES):
+    """Lazily load and split a document, yielding batches of at most batch_size chunks and max_batch_bytes of chunk text"""
+    filename = os.path.basename(file_path)
+    try:
+        pages = iter_document_pages(file_path)
         
         # Update metadata
-        filename = os.path.basename(file_path)
-        if filename in st.session_state.document_metadata:
-            st.session_state.document_metadata[filename]["status"] = "loaded"
+        record = catalog.get_document(filename)
+        if record is not None:
+            catalog.update_document(filename, status="loaded")
         
         # Split text
         text_splitter = RecursiveCharacterTextSplitter(
@@ -77,26 +132,40 @@ def process_document(file_path):
             chunk_overlap=200
         )
         
-        # Add source metadata
-        for doc in documents:
-            doc.metadata["source"] = os.path.basename(file_path)
-            doc.metadata["original_name"] = st.session_state.document_metadata[filename]["original_name"]
+        batch = []
+        batch_bytes = 0
+        chunk_count = 0
+        for page in pages:
+            # Add source metadata
+            page.metadata["source"] = filename
+            page.metadata["original_name"] = record["original_name"]
+            page.metadata["type"] = record["type"]
+            
+            # Split one page at a time so only the current page is held in memory
+            for split in text_splitter.split_documents([page]):
+                split.metadata["chunk_index"] = chunk_count
+                chunk_count += 1
+                split_bytes = len(split.page_content.encode("utf-8"))
+                
+                # Hand the batch over before this chunk would push it past either limit
+                if batch and (len(batch) >= batch_size or batch_bytes + split_bytes > max_batch_bytes):
+                    yield batch
+                    batch = []
+                    batch_bytes = 0
+                
+                batch.append(split)
+                batch_bytes += split_bytes
         
-        # Split documents
-        splits = text_splitter.split_documents(documents)
+        if batch:
+            yield batch
         
         # Update metadata
-        if filename in st.session_state.document_metadata:
-            st.session_state.document_metadata[filename]["status"] = "processed"
-            st.session_state.document_metadata[filename]["chunks"] = len(splits)
-        
-        return splits
+        if record is not None:
+            catalog.update_document(filename, status="processed", chunks=chunk_count)
     except Exception as e:
         # Update metadata with error
-        filename = os.path.basename(file_path)
-        if filename in st.session_state.document_metadata:
-            st.session_state.document_metadata[filename]["status"] = "error"
-            st.session_state.document_metadata[filename]["processing_error"] = str(e)
+        if catalog.get_document(filename) is not None:
+            catalog.update_document(filename, status="error", processing_error=str(e))
         
         raise e
 
@@ -107,25 +176,24 @@ def process_confluence_data(json_path):
         with open(json_path, 'r', encoding='utf-8') as f:
             confluence_data = json.load(f)
         
-        # Initialize document metadata if not exists
-        if "document_metadata" not in st.session_state:
-            st.session_state.document_metadata = {}
-        
         all_splits = []
+        records = []
         # Process each page
         for page in confluence_data:
             # Create a unique ID for the document
             doc_id = f"confluence_{page['id']}"
             
             # Store metadata
-            st.session_state.document_metadata[doc_id] = {
+            records.append({
+                "doc_id": doc_id,
                 "original_name": page['title'],
                 "upload_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "status": "processed",
                 "type": "confluence",
+                "page_id": page['id'],
                 "parent_id": page.get('parent_id'),
                 "enabled": True  # Default to enabled
-            }
+            })
             
             # Create document for vector store
             doc = {
@@ -137,6 +205,8 @@ def process_confluence_data(json_path):
                 }
             }
             all_splits.append(doc)
+        
+        catalog.add_documents(records)
             
         # Mark documents as processed
         st.session_state.documents_processed = True
@@ -147,18 +217,18 @@ def process_confluence_data(json_path):
         return []
 
 def process_documents(uploaded_files):
-    """Process multiple documents and return combined chunks"""
-    all_splits = []
+    """Process multiple documents and return the filenames of those processed successfully"""
+    processed_files = []
     
     for uploaded_file in uploaded_files:
         try:
             # Save file
             file_path = save_uploaded_file(uploaded_file)
             
-            # Process document
-            splits = process_document(file_path)
-            all_splits.extend(splits)
-            st.success(f"Successfully processed {uploaded_file.name} in {len(splits)} chunks")
+            # Process document, counting chunks without keeping them in memory
+            chunk_count = sum(len(batch) for batch in iter_document_chunks(file_path))
+            processed_files.append(file_path.name)
+            st.success(f"Successfully processed {uploaded_file.name} in {chunk_count} chunks")
             
         except Exception as e:
             st.error(f"Error processing {uploaded_file.name}: {str(e)}")
@@ -166,35 +236,38 @@ def process_documents(uploaded_files):
     # Mark documents as processed
     st.session_state.documents_processed = True
     
-    return all_splits
+    return processed_files
 
-def get_document_status():
-    """Get status of all documents as a DataFrame"""
-    if "document_metadata" not in st.session_state or not st.session_state.document_metadata:
+def get_document_status(filters=None, page=0, page_size=DOCUMENT_PAGE_SIZE):
+    """Get status of one page of documents as a DataFrame indexed by document id"""
+    records = catalog.list_documents(offset=page * page_size, limit=page_size, **(filters or {}))
+    if not records:
         return None
     
     # Convert metadata to DataFrame
     data = []
-    for filename, metadata in st.session_state.document_metadata.items():
+    for metadata in records:
         row = {
             "Original Name": metadata["original_name"],
             "Upload Date": metadata["upload_date"],
-            "Size (KB)": round(metadata.get("size", 0) / 1024, 2),
+            "Type": metadata["type"],
+            "Size (KB)": round(metadata["size"] / 1024, 2),
             "Status": metadata["status"],
-            "Chunks": metadata.get("chunks", 0),
-            "Error": metadata.get("processing_error", "")
+            "Chunks": metadata["chunks"],
+            "Error": metadata["processing_error"] or "",
+            "Enabled": bool(metadata["enabled"])
         }
         data.append(row)
     
-    return pd.DataFrame(data)
+    return pd.DataFrame(data, index=[metadata["doc_id"] for metadata in records])
 
 def delete_document(filename):
     """Delete a document and its metadata"""
-    if filename in st.session_state.document_metadata:
+    if catalog.get_document(filename) is not None:
         # Delete file
         file_path = DOCUMENTS_DIR / filename
         if file_path.exists():
             file_path.unlink()
         
         # Delete metadata
-        del st.session_state.document_metadata[filename]
\ No newline at end of file
+        catalog.remove_document(filename)
\ No newline at end of file
@@ -0,0 +1,67 @@
+from typing import Any, List, Optional, Set
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from config.config import RERANK_FETCH_K, RERANK_LAMBDA_MULT, RERANK_MAX_PER_SOURCE
+from utils.rerank import maximal_marginal_relevance
+
+class FAISSRetriever(BaseRetriever):
+    """Retriever over a FAISS store, filtering sources and reranking over-fetched candidates with their stored vectors"""
+
+    vector_store: Any
+    embeddings: Any
+    k: int = 5
+    sources: Optional[Set[str]] = None
+    excluded_sources: Optional[Set[str]] = None
+    fetch_k: int = RERANK_FETCH_K
+    lambda_mult: float = RERANK_LAMBDA_MULT
+    max_per_source: Optional[int] = RERANK_MAX_PER_SOURCE
+
+    def _allowed(self, doc):
+        source = doc.metadata.get("source")
+        if self.sources is not None and source not in self.sources:
+            return False
+        if self.excluded_sources is not None and source in self.excluded_sources:
+            return False
+        return True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+        fetch_k = max(self.fetch_k, self.k)
+        total = self.vector_store.index.ntotal
+        if not total:
+            return []
+
+        # Filter documents at query time, widening the search until enough candidates are allowed
+        search_k = fetch_k
+        while True:
+            _, indices = self.vector_store.index.search(vector, min(search_k, total))
+            # FAISS pads missing results with -1
+            candidates = []
+            for i in indices[0]:
+                if i == -1:
+                    continue
+                doc = self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[int(i)])
+                if self._allowed(doc):
+                    candidates.append((int(i), doc))
+            if len(candidates) >= fetch_k or search_k >= total:
+                break
+            search_k *= 4
+
+        candidates = candidates[:fetch_k]
+        if not candidates:
+            return []
+
+        # Reuse the vectors already in the index instead of re-embedding candidates
+        documents = [doc for _, doc in candidates]
+        vectors = [self.vector_store.index.reconstruct(i) for i, _ in candidates]
+        selected = maximal_marginal_relevance(
+            vector[0],
+            vectors,
+            k=self.k,
+            lambda_mult=self.lambda_mult,
+            sources=[doc.metadata.get("source") for doc in documents],
+            max_per_source=self.max_per_source
+        )
+        return [documents[i] for i in selected]
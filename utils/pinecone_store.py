@@ -0,0 +1,204 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+import streamlit as st
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from config.config import RERANK_FETCH_K, RERANK_LAMBDA_MULT, RERANK_MAX_PER_SOURCE
+from utils.rerank import maximal_marginal_relevance
+
+# Pinecone request sizing
+UPSERT_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+MAX_WORKERS = 4
+
+# Pinecone caps the number of values in an $in or $nin filter
+MAX_FILTER_VALUES = 10000
+
+# Chunks without a "type" in their metadata are regular file uploads
+DEFAULT_NAMESPACE = "file"
+
+# Metadata key holding the chunk text
+TEXT_KEY = "text"
+
+def get_pinecone_index():
+    """Get Pinecone index handle from session settings"""
+    if not all(key in st.session_state for key in ["pinecone_api_key", "pinecone_index"]):
+        st.error("Pinecone settings not found")
+        return None
+
+    return _connect(st.session_state.pinecone_api_key, st.session_state.pinecone_index)
+
+@st.cache_resource
+def _connect(api_key, index_name):
+    # One client and index handle shared by every session and rerun
+    from pinecone import Pinecone
+
+    pc = Pinecone(api_key=api_key)
+    return pc.Index(index_name)
+
+def get_namespace(metadata):
+    """Get the namespace of a document, one namespace per source type"""
+    return metadata.get("type") or DEFAULT_NAMESPACE
+
+def document_id_prefix(source):
+    """Get the id prefix shared by every chunk of a document"""
+    # Hash the source so ids stay ASCII whatever the original file name
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}#"
+
+def chunk_id(source, chunk_index):
+    """Get the deterministic id of a document chunk"""
+    return f"{document_id_prefix(source)}{chunk_index}"
+
+def list_namespaces(index):
+    """List namespaces currently holding vectors in the index"""
+    return sorted(index.describe_index_stats().namespaces)
+
+@st.cache_resource
+def get_namespaces(_index, index_name):
+    """List namespaces of the index, cached until get_namespaces.clear() after writes"""
+    return list_namespaces(_index)
+
+def _batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _run_parallel(func, items):
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(func, items))
+
+def source_filters(sources=None, excluded_sources=None):
+    """Get the query filters selecting documents, one query per filter"""
+    if excluded_sources:
+        if len(excluded_sources) > MAX_FILTER_VALUES:
+            raise ValueError(f"Cannot exclude more than {MAX_FILTER_VALUES} documents in one query")
+        return [{"source": {"$nin": list(excluded_sources)}}]
+    if sources is not None:
+        # Split long include lists over several queries, whose results are merged
+        sources = list(sources)
+        return [{"source": {"$in": batch}} for batch in _batched(sources, MAX_FILTER_VALUES)]
+    return [None]
+
+def _list_document_ids(index, source, namespace):
+    ids = []
+    for page in index.list(prefix=document_id_prefix(source), namespace=namespace):
+        ids.extend(page)
+    return ids
+
+def _delete_ids(index, ids, namespace):
+    batches = [(namespace, batch) for batch in _batched(ids, DELETE_BATCH_SIZE)]
+    _run_parallel(lambda item: index.delete(ids=item[1], namespace=item[0]), batches)
+
+def upsert_documents(index, splits, embeddings):
+    """Embed and upsert document chunks in parallel batches, return the number of vectors written"""
+    records = {}
+    chunk_counts = {}
+    for doc in splits:
+        source = doc.metadata["source"]
+        namespace = get_namespace(doc.metadata)
+
+        # Streamed chunks carry their position in the document, otherwise number them in order
+        chunk_index = doc.metadata.get("chunk_index", chunk_counts.get((namespace, source), 0))
+        chunk_counts[(namespace, source)] = chunk_index + 1
+
+        # Pinecone rejects null metadata values
+        metadata = {key: value for key, value in doc.metadata.items() if value is not None}
+        metadata[TEXT_KEY] = doc.page_content
+        records.setdefault(namespace, []).append((chunk_id(source, chunk_index), doc.page_content, metadata))
+
+    batches = [
+        (namespace, batch)
+        for namespace, namespace_records in records.items()
+        for batch in _batched(namespace_records, UPSERT_BATCH_SIZE)
+    ]
+
+    def _upsert(item):
+        namespace, batch = item
+        values = embeddings.embed_documents([text for _, text, _ in batch])
+        index.upsert(
+            vectors=[
+                {"id": vector_id, "values": vector, "metadata": metadata}
+                for (vector_id, _, metadata), vector in zip(batch, values)
+            ],
+            namespace=namespace
+        )
+        return len(batch)
+
+    return sum(_run_parallel(_upsert, batches))
+
+def prune_document(index, source, namespace, chunk_count):
+    """Delete chunks left over from a previous, longer version of a document"""
+    current = {chunk_id(source, i) for i in range(chunk_count)}
+    stale = [vector_id for vector_id in _list_document_ids(index, source, namespace) if vector_id not in current]
+    if stale:
+        _delete_ids(index, stale, namespace)
+
+def delete_documents(index, documents):
+    """Delete every vector of the given documents, a mapping of source to namespace"""
+    def _delete(item):
+        source, namespace = item
+        ids = _list_document_ids(index, source, namespace)
+        if ids:
+            _delete_ids(index, ids, namespace)
+
+    _run_parallel(_delete, list(documents.items()))
+
+class PineconeRetriever(BaseRetriever):
+    """Retriever querying every namespace of a Pinecone index, restricted to or excluding some sources"""
+
+    index: Any
+    embeddings: Any
+    namespaces: List[str]
+    k: int = 5
+    sources: Optional[List[str]] = None
+    excluded_sources: Optional[List[str]] = None
+    fetch_k: int = RERANK_FETCH_K
+    lambda_mult: float = RERANK_LAMBDA_MULT
+    max_per_source: Optional[int] = RERANK_MAX_PER_SOURCE
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = self.embeddings.embed_query(query)
+
+        # Only search enabled documents, filtered server-side
+        queries = [
+            (namespace, query_filter)
+            for namespace in self.namespaces
+            for query_filter in source_filters(self.sources, self.excluded_sources)
+        ]
+
+        # Over-fetch with stored vectors so candidates can be reranked without re-embedding
+        fetch_k = max(self.fetch_k, self.k)
+
+        def _query(item):
+            namespace, query_filter = item
+            return self.index.query(
+                vector=vector,
+                top_k=fetch_k,
+                namespace=namespace,
+                filter=query_filter,
+                include_metadata=True,
+                include_values=True
+            )
+
+        responses = _run_parallel(_query, queries)
+        matches = [match for response in responses for match in response.matches]
+        matches.sort(key=lambda match: match.score, reverse=True)
+        matches = matches[:fetch_k]
+
+        documents = []
+        for match in matches:
+            metadata = dict(match.metadata or {})
+            page_content = metadata.pop(TEXT_KEY, "")
+            documents.append(Document(page_content=page_content, metadata=metadata))
+
+        selected = maximal_marginal_relevance(
+            vector,
+            [match.values for match in matches],
+            k=self.k,
+            lambda_mult=self.lambda_mult,
+            sources=[doc.metadata.get("source") for doc in documents],
+            max_per_source=self.max_per_source
+        )
+        return [documents[i] for i in selected]
@@ -6,7 +6,8 @@ import json
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from utils.documents import process_document
+from utils.documents import iter_document_chunks
+from utils import catalog
 
 
 def preprocess_confluence_html(html_content, title, fileId, parentId):
@@ -60,24 +61,26 @@ def process_directory(directory_path, output_file):
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(documents, f, ensure_ascii=False, indent=2)
     
-    # Initialize document metadata if not exists
-    if "document_metadata" not in st.session_state:
-        st.session_state.document_metadata = {}
-        
     for doc in documents:
         file_path = f"data/documents/{doc['title']}.txt"
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(doc['content'])
         
-        st.session_state.document_metadata[f"{doc["title"]}.txt"] = {
-            "original_name": doc["title"],
-            "upload_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "size": len(doc["content"]),
-            "status": "uploaded",
-            "processing_error": None
-        }
+        catalog.add_document(
+            f"{doc["title"]}.txt",
+            original_name=doc["title"],
+            upload_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            size=len(doc["content"]),
+            status="uploaded",
+            processing_error=None,
+            type="confluence",
+            page_id=doc["id"],
+            parent_id=doc["parent_id"]
+        )
     
-        splits = process_document(file_path)
+        # Process the page, counting chunks without keeping them in memory
+        chunk_count = sum(len(batch) for batch in iter_document_chunks(file_path))
+        st.write(f"Processed {doc['title']} in {chunk_count} chunks")
     
     # Mark documents as processed
     st.session_state.documents_processed = True
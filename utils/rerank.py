@@ -0,0 +1,49 @@
+import numpy as np
+
+def maximal_marginal_relevance(query_vector, vectors, k=5, lambda_mult=0.5, sources=None, max_per_source=None):
+    """Pick up to k diverse candidates by maximal marginal relevance, return their indices in order
+
+    Candidates beyond max_per_source chunks of one source are only picked once no other candidate is left.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) == 0 or k <= 0:
+        return []
+
+    # Work on cosine similarities
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / max(np.linalg.norm(query), 1e-12)
+    relevance = vectors @ query
+
+    available = np.ones(len(vectors), dtype=bool)
+    # Candidates held back because their document already filled its slots
+    deferred = np.zeros(len(vectors), dtype=bool)
+    # Highest similarity of each candidate to the selected set, cosine is never below -1
+    redundancy = np.full(len(vectors), -1.0, dtype=np.float32)
+    selected = []
+    per_source = {}
+    while len(selected) < k and available.any():
+        candidates = available & ~deferred
+        if not candidates.any():
+            # The cap is a preference, once only held back candidates remain they fill the last slots
+            candidates = available
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~candidates] = -np.inf
+        best = int(np.argmax(scores))
+
+        # Hold back candidates from documents that already filled their slots
+        if sources is not None and max_per_source is not None:
+            source = sources[best]
+            if not deferred[best] and per_source.get(source, 0) >= max_per_source:
+                deferred[best] = True
+                continue
+            per_source[source] = per_source.get(source, 0) + 1
+
+        available[best] = False
+        selected.append(best)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+
+    return selected
@@ -1,30 +1,82 @@
-import os
 import streamlit as st
 from pathlib import Path
 from utils.embeddings import get_mistral_embeddings
-from utils.documents import DOCUMENTS_DIR, process_document
-from langchain_community.vectorstores import FAISS, Pinecone
+from utils.documents import DOCUMENTS_DIR, iter_document_chunks
+from utils import catalog
+from utils.pinecone_store import (
+    PineconeRetriever,
+    get_pinecone_index,
+    get_namespace,
+    get_namespaces,
+    upsert_documents,
+    prune_document,
+    delete_documents,
+    MAX_FILTER_VALUES
+)
+from utils.faiss_store import FAISSRetriever
+from langchain_community.vectorstores import FAISS
 
 # Vector store directory
 VECTOR_STORE_DIR = Path("./data/vector_store")
 VECTOR_STORE_DIR.mkdir(exist_ok=True, parents=True)
 
-def initialize_vector_store():
-    """Initialize vector store with processed documents"""
-    if "document_metadata" not in st.session_state or not st.session_state.document_metadata:
+def get_enabled_source_filter():
+    """Get retriever keyword arguments restricting search to the documents enabled in the catalog"""
+    return _enabled_source_filter(catalog.get_version())
+
+@st.cache_resource(max_entries=1)
+def _enabled_source_filter(catalog_version):
+    # Computed once per catalog version rather than on every rerun
+    # Filter on whichever set is smaller, Pinecone caps the values of a $nin filter
+    disabled_count = catalog.count_documents(enabled=False)
+    if disabled_count <= min(catalog.count_documents(enabled=True), MAX_FILTER_VALUES):
+        return {"excluded_sources": catalog.get_document_ids(enabled=False) or None}
+    return {"sources": catalog.get_document_ids(enabled=True)}
+
+@st.cache_resource(max_entries=1)
+def _load_faiss(index_mtime, _embeddings):
+    # Shared by every session, reloaded when the saved index changes
+    return FAISS.load_local(
+        folder_path=VECTOR_STORE_DIR,
+        embeddings=_embeddings,
+        allow_dangerous_deserialization=True
+    )
+
+def _remove_faiss_documents(vector_store, filenames):
+    """Remove every chunk of the given documents from a FAISS store"""
+    filenames = set(filenames)
+    ids = [
+        doc_id for doc_id in vector_store.index_to_docstore_id.values()
+        if vector_store.docstore.search(doc_id).metadata.get("source") in filenames
+    ]
+    if ids:
+        vector_store.delete(ids)
+
+def initialize_vector_store(filenames=None):
+    """Index processed documents in the vector store, only the given ones if filenames is set
+
+    Returns the number of documents indexed. Retrievers are built per query by load_vector_store.
+    """
+    if not catalog.count_documents():
         st.warning("No documents have been processed yet")
         return None
     
-    # Get all processed documents
-    all_splits = []
-    for filename, metadata in st.session_state.document_metadata.items():
-        if metadata["status"] == "processed":
-            file_path = DOCUMENTS_DIR / filename
-            if file_path.exists():
-                splits = process_document(file_path)
-                all_splits.extend(splits)
+    use_pinecone = st.session_state.get("use_pinecone", False)
+    index_path = VECTOR_STORE_DIR / "index.faiss"
     
-    if not all_splits:
+    # Without a saved FAISS store there is nothing to add to, so every document is indexed
+    if filenames is None or not (use_pinecone or index_path.exists()):
+        filenames = catalog.get_document_ids(status="processed")
+        rebuild = True
+    else:
+        filenames = [
+            filename for filename in filenames
+            if (catalog.get_document(filename) or {}).get("status") == "processed"
+        ]
+        rebuild = False
+    processed_files = [filename for filename in filenames if (DOCUMENTS_DIR / filename).exists()]
+    
+    if not processed_files:
         st.warning("No processed documents found")
         return None
     
@@ -33,92 +85,122 @@ def initialize_vector_store():
     if not embeddings:
         return None
     
-    # Create vector store
-    if st.session_state.get("use_pinecone", False):
-        # Check if Pinecone details are available
-        if not all(key in st.session_state for key in ["pinecone_api_key", "pinecone_env", "pinecone_index"]):
-            st.error("Pinecone settings not found")
+    # Create vector store, streaming each document in bounded batches
+    if use_pinecone:
+        index = get_pinecone_index()
+        if index is None:
             return None
         
-        # Initialize Pinecone
-        import pinecone
+        for filename in processed_files:
+            # Upsert under deterministic ids so rebuilds overwrite instead of duplicating
+            chunk_count = 0
+            for batch in iter_document_chunks(DOCUMENTS_DIR / filename):
+                chunk_count += upsert_documents(index, batch, embeddings)
+            
+            namespace = get_namespace(catalog.get_document(filename) or {})
+            prune_document(index, filename, namespace, chunk_count)
+        get_namespaces.clear()
+    else:
+        # Use FAISS, adding to the saved store unless rebuilding it
+        vector_store = None
+        if not rebuild:
+            vector_store = FAISS.load_local(
+                folder_path=VECTOR_STORE_DIR,
+                embeddings=embeddings,
+                allow_dangerous_deserialization=True
+            )
+            # Drop the chunks of an earlier version of the documents
+            _remove_faiss_documents(vector_store, processed_files)
         
-        pinecone.init(
-            api_key=st.session_state.pinecone_api_key,
-            environment=st.session_state.pinecone_env
-        )
+        for filename in processed_files:
+            for batch in iter_document_chunks(DOCUMENTS_DIR / filename):
+                if vector_store is None:
+                    vector_store = FAISS.from_documents(batch, embeddings)
+                else:
+                    vector_store.add_documents(batch)
         
-        # Create vector store
-        vector_store = Pinecone.from_documents(
-            all_splits,
-            embeddings,
-            index_name=st.session_state.pinecone_index
-        )
-    else:
-        # Use FAISS
-        vector_store = FAISS.from_documents(all_splits, embeddings)
+        if vector_store is None:
+            st.warning("No processed documents found")
+            return None
         
         # Save vector store locally
         vector_store.save_local(VECTOR_STORE_DIR)
     
-    # Create retriever
-    retriever = vector_store.as_retriever(search_kwargs={"k": 5})
-    
-    return retriever
+    return len(processed_files)
 
-def load_vector_store(enabled_docs=None):
-    """Load existing vector store, optionally filtering by enabled documents"""
+def load_vector_store(sources=None, excluded_sources=None):
+    """Load existing vector store, optionally restricted to or excluding some documents"""
     embeddings = get_mistral_embeddings()
     if not embeddings:
         return None
     
     if st.session_state.get("use_pinecone", False):
-        # Check if Pinecone details are available
-        if not all(key in st.session_state for key in ["pinecone_api_key", "pinecone_env", "pinecone_index"]):
-            st.error("Pinecone settings not found")
+        index = get_pinecone_index()
+        if index is None:
             return None
         
-        # Initialize Pinecone
-        import pinecone
-        
-        pinecone.init(
-            api_key=st.session_state.pinecone_api_key,
-            environment=st.session_state.pinecone_env
-        )
+        if sources is not None and not sources:
+            st.warning("No documents selected")
+            return None
         
-        # Load vector store
-        vector_store = Pinecone.from_existing_index(
-            st.session_state.pinecone_index,
-            embeddings
+        # Enabled documents are filtered in the Pinecone query itself
+        return PineconeRetriever(
+            index=index,
+            embeddings=embeddings,
+            namespaces=get_namespaces(index, st.session_state.pinecone_index),
+            k=5,
+            sources=sources,
+            excluded_sources=excluded_sources
         )
     else:
         # Check if local vector store exists
-        if not os.path.exists(VECTOR_STORE_DIR):
+        index_path = VECTOR_STORE_DIR / "index.faiss"
+        if not index_path.exists():
             st.warning("No local vector store found")
             return None
         
-        # Load FAISS vector store
+        if sources is not None and not sources:
+            st.warning("No documents selected")
+            return None
+        
+        # Load FAISS vector store, enabled documents are filtered at query time
+        vector_store = _load_faiss(index_path.stat().st_mtime_ns, embeddings)
+    
+    # Create retriever
+    retriever = FAISSRetriever(
+        vector_store=vector_store,
+        embeddings=embeddings,
+        k=5,
+        sources=sources,
+        excluded_sources=excluded_sources
+    )
+    
+    return retriever
+
+def delete_document_vectors(filenames):
+    """Delete the vectors of the given documents from the vector store"""
+    if not st.session_state.get("use_pinecone", False):
+        index_path = VECTOR_STORE_DIR / "index.faiss"
+        embeddings = get_mistral_embeddings()
+        if not index_path.exists() or not embeddings:
+            return
+        
         vector_store = FAISS.load_local(
-            folder_path=VECTOR_STORE_DIR, 
+            folder_path=VECTOR_STORE_DIR,
             embeddings=embeddings,
             allow_dangerous_deserialization=True
-            ) 
-        
-        # Filter by enabled documents if specified
-        if enabled_docs is not None:
-            # Create a new vector store with only enabled documents
-            filtered_docs = []
-            for doc in vector_store.docstore._dict.values():
-                if doc.metadata.get("source") in enabled_docs:
-                    filtered_docs.append(doc)
-            
-            if filtered_docs:
-                vector_store = FAISS.from_documents(filtered_docs, embeddings)
-            else:
-                st.warning("No documents selected")
-                return None
+        )
+        _remove_faiss_documents(vector_store, filenames)
+        vector_store.save_local(VECTOR_STORE_DIR)
+        return
     
-    # Create retriever
-    retriever = vector_store.as_retriever(search_kwargs={"k": 5})
+    index = get_pinecone_index()
+    if index is None:
+        return
     
-    return retriever
\ No newline at end of file
+    documents = {
+        filename: get_namespace(catalog.get_document(filename) or {})
+        for filename in filenames
+    }
+    delete_documents(index, documents)
+    get_namespaces.clear()
\ No newline at end of file